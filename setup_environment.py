@@ -1,8 +1,26 @@
 # setup_environment.py
 
+import functools
+import importlib
 import subprocess
 import sys
 
+def cached_import(name):
+    # Reuse the module already loaded in sys.modules, only go through the import system the first time
+    module = sys.modules.get(name)
+    if module is None:
+        module = importlib.import_module(name)
+    return module
+
+@functools.cache
+def apply_plot_style():
+    # Style sheets are parsed and validated on every plt.style.use call, apply them once per process
+    plt = cached_import("matplotlib.pyplot")
+
+    # Enable inline plotting, the seaborn styles only ship as 'seaborn-v0_8-*' since matplotlib 3.6 (old names removed in 3.8)
+    plt.style.use('seaborn-v0_8-whitegrid')
+    plt.ion()
+
 class SetupEnvironment:
     def __init__(self):
         self.libraries = [
@@ -13,22 +31,23 @@ class SetupEnvironment:
         ]
 
     def install_libraries(self):
-        for lib in self.libraries:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", lib])
+        # One pip process and one resolver pass for all the libraries
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "--disable-pip-version-check", *self.libraries])
 
     def import_libraries(self):
-        global pd, np, math, plt, sns
-
-        import pandas as pd
-        import numpy as np
-        import math
-        import matplotlib.pyplot as plt
-        import seaborn as sns
-
-        # Enable inline plotting
-        plt.style.use('seaborn-whitegrid')
-        plt.ion()
-        sns.set()
+        global pd, np, math
+
+        pd = cached_import("pandas")
+        np = cached_import("numpy")
+        math = cached_import("math")
+
+    def import_plotting_libraries(self):
+        # matplotlib is slow to import, so it is only loaded when a plot is requested
+        global plt
+
+        plt = cached_import("matplotlib.pyplot")
+        apply_plot_style()
+        return plt
 
     def setup(self):
         self.install_libraries()
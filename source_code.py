@@ -15,10 +15,14 @@ License: Non-commercial, Attribution-Required (see LICENSE)
 """
 
 import math
+import hashlib
+import io
+import importlib.util
 import pandas as pd
 import numpy as np
 import streamlit as st
 import plotly.graph_objs as go
+from plotly.subplots import make_subplots
 import os
 
 st.set_page_config(page_title="Lithium-Water Reaction Estimator", layout="centered")
@@ -40,8 +44,13 @@ This app models the chemical interaction between lithium and water, allowing you
 
 # ================= LICENSE AGREEMENT ENFORCEMENT =================
 LICENSE_PATH = os.path.join(os.path.dirname(__file__), 'LICENSE')
-with open(LICENSE_PATH, 'r', encoding='utf-8') as f:
-    license_text = f.read()
+
+@st.cache_data(show_spinner=False)
+def load_license(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+license_text = load_license(LICENSE_PATH)
 
 st.header("License Agreement")
 with st.expander("View License Terms", expanded=True):
@@ -69,25 +78,42 @@ def get_domain():
     elif shape == "Cylindrical":
         r = st.sidebar.number_input("Radius (m)", 0.0, 100.0, 0.5)
         h = st.sidebar.number_input("Height (m)", 0.0, 100.0, 1.0)
-        volume = math.pi * r ** 2 * h
-        area = 2 * math.pi * r * (r + h)
-        surface_area = math.pi * r ** 2
+        surface_area = math.pi * r * r
+        volume = surface_area * h
+        area = 2 * surface_area + 2 * math.pi * r * h
     elif shape == "Hemispherical":
         r = st.sidebar.number_input("Radius (m)", 0.0, 100.0, 0.5)
-        volume = (2/3) * math.pi * r ** 3
-        area = 3 * math.pi * r ** 2
-        surface_area = math.pi * r ** 2
+        surface_area = math.pi * r * r
+        volume = (2/3) * surface_area * r
+        area = 3 * surface_area
     else:
         r = st.sidebar.number_input("Radius (m)", 0.0, 100.0, 0.5)
         h = st.sidebar.number_input("Height (m)", 0.0, 100.0, 1.0)
-        volume = (2/3) * math.pi * r ** 3 + math.pi * r ** 2 * h
-        area = 3 * math.pi * r ** 2 + 2 * math.pi * r * h
-        surface_area = math.pi * r ** 2
+        surface_area = math.pi * r * r
+        volume = surface_area * ((2/3) * r + h)
+        area = 3 * surface_area + 2 * math.pi * r * h
     return {"shape": shape, "volume": volume, "area": area, "surface_area": surface_area}
 
 # =============================================================
 # SECTION 2: INPUT DATA HANDLING
 # =============================================================
+@st.cache_data(show_spinner=False)
+def load_input_workbook(data):
+    with pd.ExcelFile(io.BytesIO(data), engine='openpyxl') as xl:
+        return xl.parse('Upstream_container_volume'), xl.parse('Downstream_reaction_volume')
+
+# pyarrow is optional: it provides the multithreaded CSV reader and the Parquet engine
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+CSV_ENGINE = 'pyarrow' if HAS_PYARROW else 'c'
+UPLOAD_TYPES = ["xlsx", "csv", "parquet"] if HAS_PYARROW else ["xlsx", "csv"]
+
+@st.cache_data(show_spinner=False)
+def load_input_table(data, name):
+    # Single table holding the columns of both workbook sheets, with one 'Time (s)' column
+    if os.path.splitext(name)[1].lower() == '.parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    return pd.read_csv(io.BytesIO(data), engine=CSV_ENGINE)
+
 def get_input_data():
     st.sidebar.header("Reaction Conditions")
     mode = st.sidebar.radio("Leak Mode", ("Steady State", "Time Dependent"))
@@ -101,7 +127,7 @@ def get_input_data():
         drainage_rate = st.sidebar.number_input("Drainage Rate (kg/s)", 0.0, 100.0, 0.005)
         gas_flow = st.sidebar.number_input("Gas Flow Rate (kg/s)", 0.0, 100.0, 0.01)
         tmax = st.sidebar.number_input("Total Time (s)", 1, 100000, 1000)
-        times = np.arange(0, tmax + 1)
+        times = np.arange(0, tmax + 1, dtype=np.int64)
         data = {
             'Time (s)': times,
             'Leak_rate (kg/s)': leak_rate,
@@ -115,14 +141,12 @@ def get_input_data():
         }
         df = pd.DataFrame(data)
     else:
-        uploaded = st.sidebar.file_uploader("Upload Input_Data.xlsx", type=["xlsx"])
-        if uploaded:
-            df1 = pd.read_excel(uploaded, sheet_name='Upstream_container_volume')
-            df2 = pd.read_excel(uploaded, sheet_name='Downstream_reaction_volume')
-            df = pd.concat([df1, df2], axis=1)
-            time_cols = df.columns[df.columns == 'Time (s)']
-            if len(time_cols) > 1:
-                df = df.drop(time_cols[2:], axis=1)
+        uploaded = st.sidebar.file_uploader("Upload Input_Data.xlsx (or a single table file)", type=UPLOAD_TYPES)
+        if uploaded and os.path.splitext(uploaded.name)[1].lower() == '.xlsx':
+            df1, df2 = load_input_workbook(uploaded.getvalue())
+            df = pd.concat([df1, df2.drop(columns=['Time (s)'], errors='ignore')], axis=1)
+        elif uploaded:
+            df = load_input_table(uploaded.getvalue(), uploaded.name)
         else:
             st.warning("Upload required for Time Dependent mode.")
             return None
@@ -134,22 +158,21 @@ def get_input_data():
 def calculate_lithium_density(temperature):
     """
     Returns the density of lithium (kg/m³) as a function of temperature (K).
+    Accepts a scalar or a NumPy array of temperatures and is evaluated elementwise.
     """
     return 562 - 0.1 * temperature
 
+# Water density correlation, numerator coefficients in increasing powers of temperature
+WATER_DENSITY_NUM = np.array([999.83952, 16.945176, -0.0079870401, -4.6170461e-5, 1.0556302e-7, -2.8054253e-10])
+WATER_DENSITY_G = 0.01687985
+
 def calculate_water_density(temperature):
     """
     Returns the density of water (kg/m³) as a function of temperature (K).
+    Accepts a scalar or a NumPy array of temperatures and is evaluated elementwise.
     """
-    a= -2.8054253e-10
-    b = 1.0556302e-7
-    c = -4.6170461e-5
-    d = -0.0079870401
-    e = 16.945176
-    f = 999.83952
-    g = 0.01687985
-    numerator = ((((a * temperature + b) * temperature + c) * temperature + d) * temperature + e) * temperature + f
-    denominator = 1 + g * temperature
+    numerator = np.polynomial.polynomial.polyval(temperature, WATER_DENSITY_NUM)
+    denominator = 1 + WATER_DENSITY_G * temperature
     return numerator / denominator
 
 # =============================================================
@@ -166,59 +189,100 @@ def get_kinetics():
         ea = None
     return model, freq, ea
 
-def reaction_coeff(model, temp, freq=None, ea=None, R=8.314):
-    if model == 'Arrhenius':
-        return freq * math.exp(-(ea / (R * temp)))
-    elif model == 'Linear':
-        return ((0.8173 * temp) - 30.738) / (100 * 3600)
-    elif model == 'Exponential':
-        return (0.9384 * math.exp(0.0431 * temp)) / (100 * 3600)
-    return 0
+# Linear and exponential fits are in mg/cm².hr, the unit transfer to kg/m².s is folded into the constants
+UNIT_TRANSFER = 1 / (100 * 3600)
+LIN_A, LIN_B = 0.8173 * UNIT_TRANSFER, -30.738 * UNIT_TRANSFER
+EXP_A, EXP_B = 0.9384 * UNIT_TRANSFER, 0.0431
+
+KELVIN_OFFSET = 273.15
+
+def arrhenius_coeff(temp, freq=None, ea=None, R=8.314):
+    # Input temperatures are in °C, the Arrhenius equation needs them in K
+    neg_ea_over_R = -ea / R
+    return freq * np.exp(neg_ea_over_R / (temp + KELVIN_OFFSET))
+
+def linear_coeff(temp, freq=None, ea=None, R=8.314):
+    return LIN_A * temp + LIN_B
+
+def exponential_coeff(temp, freq=None, ea=None, R=8.314):
+    return EXP_A * np.exp(EXP_B * temp)
+
+KINETIC_MODELS = {'Arrhenius': arrhenius_coeff, 'Linear': linear_coeff, 'Exponential': exponential_coeff}
 
 # =============================================================
 # SECTION 5: MAIN SIMULATION LOGIC
 # =============================================================
-@st.cache_data(show_spinner=False)
-def run_sim(domain, df, model, freq, ea):
+def run_sim_kernel(t, T, leak, drain, gas, area, model, freq, ea):
     MW_H2O, MW_Li, MW_LiOH, MW_H2 = 0.01801528, 0.006941, 0.02395, 0.002016
-    area = domain['surface_area']
     alfa, beta = 1, 0.45
+    n = len(t)
+    if model == 'Arrhenius' and freq == 0:
+        # Zero pre-exponential factor, nothing reacts and the pool only follows the imposed flows
+        vap_flow = np.cumsum(gas, dtype=np.float64)
+        li_inv = np.cumsum(np.subtract(leak, drain, dtype=np.float64))
+        return np.zeros(n), np.zeros(n), np.zeros(n), np.zeros(n), np.zeros(n), vap_flow, li_inv
+    # Each result array is allocated once, the intermediate steps are applied in place
+    # log(alfa + beta*t) written as log1p, exact for alfa = 1 and more accurate for the first seconds
+    H2O = np.log1p((alfa - 1) + beta * t, out=np.zeros(n), where=t > 0)
+    H2O *= KINETIC_MODELS[model](T, freq, ea)
+    H2O *= area
+    H2O_mol = H2O / MW_H2O
+    Li = H2O_mol * MW_Li
+    LiOH = H2O_mol * MW_LiOH
+    H2 = H2O_mol * (0.5 * MW_H2)
+    heat = 222 * H2O_mol
+    vap_flow = np.subtract(gas, H2O)
+    np.cumsum(vap_flow, out=vap_flow)
+    li_inv = np.subtract(leak, drain, dtype=np.float64)
+    li_inv -= Li
+    np.cumsum(li_inv, out=li_inv)
+    return H2O, Li, LiOH, H2, heat, vap_flow, li_inv
+
+def input_fingerprint(*arrays):
+    # Short digest of the input columns, used as the simulation cache key instead of hashing the DataFrame
+    digest = hashlib.blake2b(digest_size=16)
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        digest.update(f"{a.dtype}{a.shape}".encode())
+        digest.update(a.data)
+    return digest.hexdigest()
+
+# Arguments starting with an underscore are not hashed by st.cache_data, the arrays are keyed by input_key
+@st.cache_data(show_spinner=False)
+def cached_run_sim(input_key, _t, _T, _leak, _drain, _gas, area, model, freq, ea):
+    return run_sim_kernel(_t, _T, _leak, _drain, _gas, area, model, freq, ea)
+
+def input_columns(df):
     n = len(df)
-    t = df['Time (s)'].values
-    T = df['Downstream_Temperature (°C)'].values
-    leak = df['Leak_rate (kg/s)'].values if 'Leak_rate (kg/s)' in df else np.zeros(n)
-    drain = df['Drainage_rate (kg/s)'].values if 'Drainage_rate (kg/s)' in df else np.zeros(n)
-    gas = df['Gas_flow_rate (kg/s)'].values if 'Gas_flow_rate (kg/s)' in df else np.zeros(n)
-    H2O, Li, LiOH, H2, heat = [], [], [], [], []
-    vap_flow, li_inv = [], []
-    li_pool, vap = 0, 0
-    for i in range(n):
-        reac_coeff = reaction_coeff(model, T[i], freq, ea)
-        H2O_kg = reac_coeff * math.log(alfa + beta * t[i]) * area if t[i] > 0 else 0
-        H2O_mol = H2O_kg / MW_H2O
-        Li_kg = H2O_mol * MW_Li
-        LiOH_kg = H2O_mol * MW_LiOH
-        H2_kg = H2O_mol * 0.5 * MW_H2
-        heat_kj = 222 * H2O_mol
-        H2O.append(H2O_kg)
-        Li.append(Li_kg)
-        LiOH.append(LiOH_kg)
-        H2.append(H2_kg)
-        heat.append(heat_kj)
-        vap += gas[i] - H2O_kg
-        vap_flow.append(vap)
-        li_pool += leak[i] - drain[i] - Li_kg
-        li_inv.append(li_pool)
-    return t, H2O, Li, LiOH, H2, heat, vap_flow, li_inv
+    t = df['Time (s)'].to_numpy()
+    T = df['Downstream_Temperature (°C)'].to_numpy()
+    leak = df['Leak_rate (kg/s)'].to_numpy() if 'Leak_rate (kg/s)' in df else np.zeros(n)
+    drain = df['Drainage_rate (kg/s)'].to_numpy() if 'Drainage_rate (kg/s)' in df else np.zeros(n)
+    gas = df['Gas_flow_rate (kg/s)'].to_numpy() if 'Gas_flow_rate (kg/s)' in df else np.zeros(n)
+    return t, T, leak, drain, gas
+
+def run_sim(t, T, leak, drain, gas, area, model, freq, ea):
+    input_key = input_fingerprint(t, T, leak, drain, gas)
+    return (t, *cached_run_sim(input_key, t, T, leak, drain, gas, area, model, freq, ea))
 
 # =============================================================
 # SECTION 6: PLOTTING WITH PLOTLY
 # =============================================================
-def plot_lines(x, ys, names, title, ytitle):
-    fig = go.Figure()
-    for y, name in zip(ys, names):
-        fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name=name))
-    fig.update_layout(title=title, xaxis_title='Time (s)', yaxis_title=ytitle, template='plotly_dark', height=400)
+def plot_results(x, panels, max_points=4000):
+    # One figure with a row per (ys, names, title, ytitle) panel, sent to the browser as a single chart
+    fig = make_subplots(rows=len(panels), cols=1, shared_xaxes=True, vertical_spacing=0.04,
+                        subplot_titles=[title for _, _, title, _ in panels])
+    # WebGL traces, long transients are strided down to about max_points for display only,
+    # always keeping the last sample so the end-of-transient inventories are shown
+    stride = max(len(x) // max_points, 1)
+    idx = np.unique(np.r_[0:len(x):stride, len(x) - 1])
+    x = np.asarray(x)[idx]
+    for row, (ys, names, title, ytitle) in enumerate(panels, start=1):
+        for y, name in zip(ys, names):
+            fig.add_trace(go.Scattergl(x=x, y=np.asarray(y)[idx], mode='lines', name=name), row=row, col=1)
+        fig.update_yaxes(title_text=ytitle, row=row, col=1)
+    fig.update_xaxes(title_text='Time (s)', row=len(panels), col=1)
+    fig.update_layout(template='plotly_dark', height=350 * len(panels))
     st.plotly_chart(fig, use_container_width=True)
 
 # =============================================================
@@ -231,13 +295,15 @@ def main():
         st.stop()
     model, freq, ea = get_kinetics()
     if st.button("Run Simulation"):
-        t, H2O, Li, LiOH, H2, heat, vap_flow, li_inv = run_sim(domain, df, model, freq, ea)
+        t, H2O, Li, LiOH, H2, heat, vap_flow, li_inv = run_sim(*input_columns(df), domain['surface_area'], model, freq, ea)
         st.subheader("Simulation Results")
-        plot_lines(t, [H2O, Li], ["H₂O (kg)", "Li (kg)"], "Reactants vs Time", "Mass (kg)")
-        plot_lines(t, [H2, LiOH], ["H₂ (kg)", "LiOH (kg)"], "Products vs Time", "Mass (kg)")
-        plot_lines(t, [heat], ["Heat Released (kJ)"], "Cumulative Heat Generation", "Heat (kJ)")
-        plot_lines(t, [vap_flow], ["Cumulative Water/Vapour Flow (kg)"], "Water/Vapour Flow Over Pool", "Flow (kg)")
-        plot_lines(t, [li_inv], ["Lithium Inventory (kg)"], "Lithium Inventory in Pool", "Inventory (kg)")
+        plot_results(t, [
+            ([H2O, Li], ["H₂O (kg)", "Li (kg)"], "Reactants vs Time", "Mass (kg)"),
+            ([H2, LiOH], ["H₂ (kg)", "LiOH (kg)"], "Products vs Time", "Mass (kg)"),
+            ([heat], ["Heat Released (kJ)"], "Cumulative Heat Generation", "Heat (kJ)"),
+            ([vap_flow], ["Cumulative Water/Vapour Flow (kg)"], "Water/Vapour Flow Over Pool", "Flow (kg)"),
+            ([li_inv], ["Lithium Inventory (kg)"], "Lithium Inventory in Pool", "Inventory (kg)"),
+        ])
         st.success(f"Calculation completed for {int(t[-1])} seconds.")
 
 if __name__ == "__main__":